@@ -6,13 +6,22 @@
 from collections import defaultdict
 from collections.abc import Mapping, MutableSequence, Sequence
 from dataclasses import dataclass
-from struct import pack, pack_into, unpack_from
+from struct import Struct, pack_into, unpack_from
 from typing import Literal, Optional, Tuple
 
 from .lz import decompress_code, compress_code
 
 START_INFO_SIGNATURE_DS: bytes = bytes.fromhex("2106C0DEDEC00621")
 START_INFO_SIGNATURE_DSI: bytes = bytes.fromhex("6314C0DEDEC01463")
+AUTOLOAD_SECTION_DS_STRUCT = Struct("<3I")
+"""
+An autoload section entry on DS ROMs: its destination, size, and BSS size.
+"""
+AUTOLOAD_SECTION_DSI_STRUCT = Struct("<4I")
+"""
+An autoload section entry on DSi ROMs: its destination, size, static initializer
+function pointer, and BSS size.
+"""
 CODE_HEADER_LEN_MAP: Mapping[Literal["7"] | Literal["9"], int] = {
     "7": 0x1000,
     "9": 0x4000,
@@ -51,7 +60,7 @@ class AutoloadSectionInfo:
     
     @staticmethod
     def from_bytes_ds(code: bytes, offset: int) -> "AutoloadSectionInfo":
-        return AutoloadSectionInfo(*unpack_from("<3I", code, offset))
+        return AutoloadSectionInfo(*AUTOLOAD_SECTION_DS_STRUCT.unpack_from(code, offset))
 
     @staticmethod
     def from_bytes_dsi(code: bytes, offset: int) -> "AutoloadSectionInfo":
@@ -59,14 +68,14 @@ class AutoloadSectionInfo:
             k:v
             for k, v in zip(
                 ["destination", "size", "static_init_fun_ptr", "bss_size"],
-                unpack_from("<4I", code, offset),
+                AUTOLOAD_SECTION_DSI_STRUCT.unpack_from(code, offset),
             )
         })
 
     def to_bytes_ds(self, size: Optional[int] = None) -> bytes:
         if size is None:
             size = self.size
-        return pack("<3I", self.destination, size, self.bss_size)
+        return AUTOLOAD_SECTION_DS_STRUCT.pack(self.destination, size, self.bss_size)
 
     def to_bytes_dsi(self, size: Optional[int] = None) -> bytes:
         if size is None:
@@ -75,7 +84,7 @@ class AutoloadSectionInfo:
             static_init_fun_ptr = 0
         else:
             static_init_fun_ptr = self.static_init_fun_ptr
-        return pack("<4I", self.destination, size, static_init_fun_ptr, self.bss_size)
+        return AUTOLOAD_SECTION_DSI_STRUCT.pack(self.destination, size, static_init_fun_ptr, self.bss_size)
 
 @dataclass
 class CodeStartParams:
@@ -461,7 +470,7 @@ def try_find_start_info_no_signature(code: bytes, loadaddress: int, entrypoint:
             for i in range(au_secs_start, au_secs_end, 12):
                 if i - loadaddress + 12 > lc_aligned:
                     break
-                destination, size, bss_size = unpack_from("<3I", code, i - loadaddress)
+                destination, size, bss_size = AUTOLOAD_SECTION_DS_STRUCT.unpack_from(code, i - loadaddress)
                 if destination & 3 != 0 or size & 3 != 0 or bss_size & 3 != 0:
                     break
                 au_start += size
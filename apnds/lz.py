@@ -3,48 +3,79 @@
 # Copyright (C) 2025-2026 James Petersen <m@jamespetersen.ca>
 # Licensed under MIT. See LICENSE
 
-from typing import Tuple
+from struct import unpack_from
+from typing import Tuple, overload
 
-def decompress(data: bytes) -> bytes:
+@overload
+def decompress(data: bytes, out: None = None) -> bytes: ...
+
+@overload
+def decompress(data: bytes, out: bytearray) -> bytearray: ...
+
+def decompress(data: bytes, out: bytearray | None = None) -> bytes | bytearray:
+    """
+    Decompress some LZ10-compressed data.
+
+    If out is given, the data is decompressed into it, and it is returned
+    instead of a new bytes object. It is resized to the size of the decompressed data.
+    This allows a buffer to be reused when decompressing many files.
+    """
     if len(data) < 4:
         raise ValueError('cannot decompress less than 4 bytes of data')
 
     if data[0] != 0x10:
         raise ValueError('expected first byte of data to be decompressed to be 0x10')
 
-    ret = bytearray(int.from_bytes(data[1:4], 'little'))
+    # the size is stored in the three bytes after the 0x10 marker.
+    size = unpack_from("<I", data)[0] >> 8
+    if out is None:
+        ret = bytearray(size)
+    else:
+        ret = out
+        if len(ret) > size:
+            del ret[size:]
+        else:
+            ret.extend(bytes(size - len(ret)))
 
+    data_len = len(data)
     src_pos = 4
     dest_pos = 0
 
     while True:
-        if src_pos >= len(data):
+        if src_pos >= data_len:
             raise ValueError('data could not be decompressed properly')
         flags = data[src_pos]
         src_pos += 1
         for _ in range(8):
             if flags & 0x80 != 0:
-                block_size = (data[src_pos] >> 4) + 3
-                block_distance = (((data[src_pos] & 0xF) << 8) | data[src_pos + 1]) + 1
+                b = data[src_pos]
+                block_size = (b >> 4) + 3
+                block_distance = (((b & 0xF) << 8) | data[src_pos + 1]) + 1
 
                 src_pos += 2
 
                 block_pos = dest_pos - block_distance
-                if block_pos < 0:
+                if block_pos < 0 or dest_pos + block_size > size:
                     raise ValueError('data could not be decompressed properly')
 
-                for i in range(block_size):
-                    ret[dest_pos] = ret[block_pos + i]
-                    dest_pos += 1
+                # copy the whole block with a single slice. if the block overlaps
+                # the bytes it is being written to, it is a repetition of the
+                # last block_distance bytes.
+                if block_distance >= block_size:
+                    ret[dest_pos:dest_pos + block_size] = ret[block_pos:block_pos + block_size]
+                else:
+                    pattern = ret[block_pos:dest_pos]
+                    ret[dest_pos:dest_pos + block_size] = (pattern * (block_size // block_distance + 1))[:block_size]
+                dest_pos += block_size
             else:
-                if src_pos >= len(data) or dest_pos >= len(ret):
+                if src_pos >= data_len or dest_pos >= size:
                     raise ValueError('data could not be decompressed properly')
                 ret[dest_pos] = data[src_pos]
                 src_pos += 1
                 dest_pos += 1
 
-            if dest_pos == len(ret):
-                return bytes(ret)
+            if dest_pos == size:
+                return ret if out is not None else bytes(ret)
             flags <<= 1
 
 def decompress_code(code: bytes, compressed_top: int) -> Tuple[bytes, bytes]:
@@ -98,62 +129,79 @@ def compress(data: bytes, min_distance: int = 2, forward_iteration: bool = True,
     src_pos = 0
     dest_pos = 4
 
+    def match_len(src: bytes, block_start: int, src_pos: int, block_size: int, max_size: int) -> int:
+        # compare up to eight bytes at a time. the first mismatched byte
+        # is found from the lowest set bit of the difference.
+        while block_size < max_size:
+            n = min(8, max_size - block_size)
+            diff = int.from_bytes(src[block_start + block_size:block_start + block_size + n], 'little') \
+                ^ int.from_bytes(src[src_pos + block_size:src_pos + block_size + n], 'little')
+            if diff != 0:
+                return block_size + (((diff & -diff).bit_length() - 1) >> 3)
+            block_size += n
+        return block_size
+
+    # the candidate blocks are located with bytes.find (or bytes.rfind),
+    # growing the searched prefix each time a longer match is found.
+    # a block may overlap the data at src_pos, so the whole source is
+    # searched, with the end bound limiting where the block can start.
     if forward_iteration:
         def find_best_block(src: bytes, src_pos: int) -> Tuple[int, int]:
-            best_block_size = 0
-            best_block_distance = 0
-            block_start = max(0, src_pos - 0x1000)
-            
-            while block_start != src_pos:
-                block_size = 0
-
-                while block_size < 18 and src_pos + block_size < len(src) and src[block_start + block_size] == src[src_pos + block_size]:
-                    block_size += 1
-
-                if block_size > best_block_size and src_pos - block_start >= min_distance:
-                    best_block_distance = src_pos - block_start
-                    best_block_size = block_size
-
-                    if block_size == 18:
-                        break
-
-                block_start += 1
+            max_size = min(18, len(src) - src_pos)
+            lowest = max(0, src_pos - 0x1000)
+            highest = src_pos - max(min_distance, 1)
+            if max_size < 3 or highest < lowest:
+                return (0, 0)
+
+            block_start = src.find(src[src_pos:src_pos + 3], lowest, highest + 3)
+            if block_start == -1:
+                return (0, 0)
+            block_size = match_len(src, block_start, src_pos, 3, max_size)
+
+            # the earliest block which is longer than the current one must start after it.
+            while block_size < max_size:
+                next_start = src.find(src[src_pos:src_pos + block_size + 1], block_start + 1, highest + block_size + 1)
+                if next_start == -1:
+                    break
+                block_start = next_start
+                block_size = match_len(src, block_start, src_pos, block_size + 1, max_size)
 
-            return (best_block_distance, best_block_size)
+            return (src_pos - block_start, block_size)
     else:
         def find_best_block(src: bytes, src_pos: int) -> Tuple[int, int]:
-            best_block_size = 0
-            best_block_distance = 0
-            block_distance = min_distance
-
-            while block_distance <= src_pos and block_distance <= 0x1000:
-                block_start = src_pos - block_distance
-                block_size = 0
-
-                while block_size < 18 and src_pos + block_size < len(src) and src[block_start + block_size] == src[src_pos + block_size]:
-                    block_size += 1
-
-                if block_size > best_block_size:
-                    best_block_distance = block_distance
-                    best_block_size = block_size
-
-                    if block_size == 18:
-                        break
+            max_size = min(18, len(src) - src_pos)
+            lowest = max(0, src_pos - 0x1000)
+            highest = src_pos - max(min_distance, 1)
+            if max_size < 3 or highest < lowest:
+                return (0, 0)
+
+            block_start = src.rfind(src[src_pos:src_pos + 3], lowest, highest + 3)
+            if block_start == -1:
+                return (0, 0)
+            block_size = match_len(src, block_start, src_pos, 3, max_size)
+
+            # the closest block which is longer than the current one must start before it.
+            while block_size < max_size:
+                next_start = src.rfind(src[src_pos:src_pos + block_size + 1], lowest, block_start + block_size)
+                if next_start == -1:
+                    break
+                block_start = next_start
+                block_size = match_len(src, block_start, src_pos, block_size + 1, max_size)
 
-                block_distance += 1
+            return (src_pos - block_start, block_size)
 
-            return (best_block_distance, best_block_size)
+    data_len = len(data)
 
     while True:
         flags_pos = dest_pos
         dest_pos += 1
-        ret[flags_pos] = 0
+        flags = 0
 
         for i in range(8):
             best_block_distance, best_block_size = find_best_block(data, src_pos)
 
             if best_block_size >= 3:
-                ret[flags_pos] |= (0x80 >> i)
+                flags |= (0x80 >> i)
                 src_pos += best_block_size
                 best_block_size -= 3
                 best_block_distance -= 1
@@ -165,15 +213,15 @@ def compress(data: bytes, min_distance: int = 2, forward_iteration: bool = True,
                 dest_pos += 1
                 src_pos += 1
 
-            if src_pos == len(data):
+            if src_pos == data_len:
+                ret[flags_pos] = flags
                 if pad:
-                    rem = dest_pos & 3
-                    if rem != 0:
-                        for i in range(4 - rem):
-                            ret[dest_pos] = 0
-                            dest_pos += 1
+                    # the buffer is zeroed, and large enough to hold the padding.
+                    dest_pos += -dest_pos & 3
+
+                return bytes(memoryview(ret)[:dest_pos])
 
-                return bytes(ret[:dest_pos])
+        ret[flags_pos] = flags
 
 def compress_code(code: bytes) -> bytes | None:
     """
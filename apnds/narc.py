@@ -3,7 +3,7 @@
 # Copyright (C) 2025 James Petersen <m@jamespetersen.ca>
 # Licensed under MIT. See LICENSE
 
-from .rom import get_filename_id_map, path_key_to_path, path_key
+from .rom import FAT_ENTRY_STRUCT, FNTB_DIR_ID_STRUCT, FNTB_DIR_STRUCT, get_filename_id_map, path_key_to_path, path_key
 
 from collections.abc import Mapping, MutableMapping, MutableSequence
 from dataclasses import dataclass
@@ -15,18 +15,20 @@ HEADER_LE_BOM = 0xFFFE
 HEADER_VERSION_MARKER = 0x100
 
 def construct_fntb_forced_ids(filename_id_map: Mapping[str, int]) -> bytes:
-    header = bytes()
-    contents = bytes()
+    header = bytearray()
+    contents = bytearray()
 
     cur_dir = tuple()
     dir_map: MutableMapping[Tuple[str, ...], Tuple[int, MutableSequence[Tuple[str, int | None]]]] = {}
     dir_map[()] = (0xF000, [])
 
+    path_key_id_map = {path_key(path): id for path, id in filename_id_map.items()}
+
     # within a directory, this will sort files by their id.
     def path_key_for_sorted(pk: Tuple[str, ...]) -> Tuple[str, ...]:
-        return (*pk[:-1], f"\0{filename_id_map[path_key_to_path(*pk)]:04X}")
+        return (*pk[:-1], f"\0{path_key_id_map[pk]:04X}")
 
-    paths = sorted(map(path_key, filename_id_map), key=path_key_for_sorted)
+    paths = sorted(path_key_id_map, key=path_key_for_sorted)
 
     for pk in paths:
         parent_dir = pk[:-1]
@@ -48,22 +50,23 @@ def construct_fntb_forced_ids(filename_id_map: Mapping[str, int]) -> bytes:
         last_file_id = None
         len_contents_before = len(contents)
         for name, id_if_dir in children:
-            contents += int.to_bytes(len(name) | (0x00 if id_if_dir is None else 0x80), 1)
-            contents += name.encode('ascii')
+            name_bytes = name.encode('ascii')
+            contents.append(len(name_bytes) | (0x00 if id_if_dir is None else 0x80))
+            contents += name_bytes
             if id_if_dir is not None:
-                contents += int.to_bytes(id_if_dir, 2, 'little')
+                contents += FNTB_DIR_ID_STRUCT.pack(id_if_dir)
             else:
                 if last_file_id is None:
-                    base_file_id = last_file_id = filename_id_map[path_key_to_path(*pk, name)]
+                    base_file_id = last_file_id = path_key_id_map[(*pk, name)]
                 else:
-                    this_file_id = filename_id_map[path_key_to_path(*pk, name)]
+                    this_file_id = path_key_id_map[(*pk, name)]
                     if this_file_id != last_file_id + 1:
                         raise ValueError("canont build fnt: nonconsecutive file ids within a directory (" + path_key_to_path(*pk, name) + ")")
                     last_file_id = this_file_id
-        header += pack("<I2H", len_contents_before + header_len, base_file_id, parent_id)
-        contents += b'\0'
+        header += FNTB_DIR_STRUCT.pack(len_contents_before + header_len, base_file_id, parent_id)
+        contents.append(0)
 
-    return header + contents
+    return b''.join((header, contents))
 
 @dataclass
 class Narc:
@@ -110,13 +113,18 @@ class Narc:
         fatb_contents = bytearray(8 * len(self.files))
         coff = 0
         for i, file in enumerate(self.files):
-            pack_into("<2I", fatb_contents, 8 * i, coff, coff + len(file))
+            FAT_ENTRY_STRUCT.pack_into(fatb_contents, 8 * i, coff, coff + len(file))
             coff += len(file)
             coff += -coff & 3
         fatb = pack("<4sII", b'BTAF', 12 + 8 * len(self.files), len(self.files)) + fatb_contents
-        def padded_file(file: bytes) -> bytes:
-            return file + b'\0' * (-len(file) & 3)
-        fimg = pack("<4sI", b'GMIF', coff + 8) + b''.join(padded_file(file) for file in self.files)
+        # the files are copied into a zeroed buffer, so their padding is already present.
+        fimg = bytearray(coff + 8)
+        pack_into("<4sI", fimg, 0, b'GMIF', coff + 8)
+        coff = 8
+        for file in self.files:
+            fimg[coff:coff + len(file)] = file
+            coff += len(file)
+            coff += -coff & 3
         fntb = construct_fntb_forced_ids(self.filename_id_map)
         fntb = pack("<4sI", b'BTNF', 8 + len(fntb)) + fntb
 
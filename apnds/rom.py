@@ -3,12 +3,12 @@
 # Copyright (C) 2025-2026 James Petersen <m@jamespetersen.ca>
 # Licensed under MIT. See LICENSE
 
+from collections import deque
 from collections.abc import Iterable, Mapping, MutableMapping, MutableSequence, Sequence
 from dataclasses import dataclass
 from enum import IntEnum
 from itertools import chain
-from queue import SimpleQueue
-from struct import pack, pack_into, unpack_from
+from struct import Struct, unpack_from
 from typing import Literal, Tuple
 
 from .aes import aes_ctr
@@ -21,6 +21,16 @@ BANNER_SIZE_MAP: Mapping[int, int] = {
     0x103: 0x23C0,
 }
 
+BytesLike = bytes | bytearray | memoryview
+"""
+The types of ROM data accepted when reading a ROM. Views are read without copying.
+"""
+
+ARM9_FOOTER_MAGIC: bytes = bytes.fromhex("2106C0DE")
+"""
+The magic number at the start of the 12-byte footer following the ARM9 code.
+"""
+
 ST_MROM = 0x51E
 ST_PROM = 0xD7E
 
@@ -261,236 +271,47 @@ class HeaderField(IntEnum):
         Given a header field, this returns the subsequent header field.
         For ENTIRE_HEADER, it returns ENTIRE_HEADER.
         """
-        match self:
-            case HeaderField.TITLE:
-                return HeaderField.SERIAL
-            case HeaderField.SERIAL:
-                return HeaderField.MAKER
-            case HeaderField.MAKER:
-                return HeaderField.UNITCODE
-            case HeaderField.UNITCODE:
-                return HeaderField.ENCRYPTION_SEED_SELECT
-            case HeaderField.ENCRYPTION_SEED_SELECT:
-                return HeaderField.CHIPCAPACITY
-            case HeaderField.CHIPCAPACITY:
-                return HeaderField.RESERVED_015
-            case HeaderField.RESERVED_015:
-                return HeaderField.DSI_FLAGS
-            case HeaderField.DSI_FLAGS:
-                return HeaderField.NDS_REGION_DSI_PERMIT_JUMP
-            case HeaderField.NDS_REGION_DSI_PERMIT_JUMP:
-                return HeaderField.REVISION
-            case HeaderField.REVISION:
-                return HeaderField.ARM9_ROMOFFSET
-            case HeaderField.ARM9_ROMOFFSET:
-                return HeaderField.ARM9_ENTRYPOINT
-            case HeaderField.ARM9_ENTRYPOINT:
-                return HeaderField.ARM9_LOADADDR
-            case HeaderField.ARM9_LOADADDR:
-                return HeaderField.ARM9_LOADSIZE
-            case HeaderField.ARM9_LOADSIZE:
-                return HeaderField.ARM7_ROMOFFSET
-            case HeaderField.ARM7_ROMOFFSET:
-                return HeaderField.ARM7_ENTRYPOINT
-            case HeaderField.ARM7_ENTRYPOINT:
-                return HeaderField.ARM7_LOADADDR
-            case HeaderField.ARM7_LOADADDR:
-                return HeaderField.ARM7_LOADSIZE
-            case HeaderField.ARM7_LOADSIZE:
-                return HeaderField.FNTB_ROMOFFSET
-            case HeaderField.FNTB_ROMOFFSET:
-                return HeaderField.FNTB_BSIZE
-            case HeaderField.FNTB_BSIZE:
-                return HeaderField.FATB_ROMOFFSET
-            case HeaderField.FATB_ROMOFFSET:
-                return HeaderField.FATB_BSIZE
-            case HeaderField.FATB_BSIZE:
-                return HeaderField.OVT9_ROMOFFSET
-            case HeaderField.OVT9_ROMOFFSET:
-                return HeaderField.OVT9_BSIZE
-            case HeaderField.OVT9_BSIZE:
-                return HeaderField.OVT7_ROMOFFSET
-            case HeaderField.OVT7_ROMOFFSET:
-                return HeaderField.OVT7_BSIZE
-            case HeaderField.OVT7_BSIZE:
-                return HeaderField.ROMCTRL_DEC
-            case HeaderField.ROMCTRL_DEC:
-                return HeaderField.ROMCTRL_ENC
-            case HeaderField.ROMCTRL_ENC:
-                return HeaderField.BANNER_ROMOFFSET
-            case HeaderField.BANNER_ROMOFFSET:
-                return HeaderField.SECURECRC
-            case HeaderField.SECURECRC:
-                return HeaderField.SECURE_DELAY
-            case HeaderField.SECURE_DELAY:
-                return HeaderField.ARM9_AUTOLOADCB
-            case HeaderField.ARM9_AUTOLOADCB:
-                return HeaderField.ARM7_AUTOLOADCB
-            case HeaderField.ARM7_AUTOLOADCB:
-                return HeaderField.ROMSIZE
-            case HeaderField.ROMSIZE:
-                return HeaderField.HEADERSIZE
-            case HeaderField.HEADERSIZE:
-                return HeaderField.NDS_UNK_DSI_ARM9_PARAMS_TABLE_OFFSET
-            case HeaderField.NDS_UNK_DSI_ARM9_PARAMS_TABLE_OFFSET:
-                return HeaderField.ARM7_PARAMS_TABLE_OFFSET
-            case HeaderField.ARM7_PARAMS_TABLE_OFFSET:
-                return HeaderField.NTR_ROM_REGION_END
-            case HeaderField.NTR_ROM_REGION_END:
-                return HeaderField.TWL_ROM_REGION_START
-            case HeaderField.TWL_ROM_REGION_START:
-                return HeaderField.TWL_ROM_REGION_START_END
-            case HeaderField.TWL_ROM_REGION_START_END:
-                return HeaderField.HEADERCRC
-            case HeaderField.HEADERCRC:
-                return HeaderField.DEBUG_ROM_SOURCE
-            case HeaderField.DEBUG_ROM_SOURCE:
-                return HeaderField.DEBUG_ROM_SIZE
-            case HeaderField.DEBUG_ROM_SIZE:
-                return HeaderField.DEBUG_ROM_DESTINATION
-            case HeaderField.DEBUG_ROM_DESTINATION:
-                return HeaderField.UNK_16C
-            case HeaderField.UNK_16C:
-                return HeaderField.ZEROS_170
-            case HeaderField.ZEROS_170:
-                return HeaderField.MBK_GLOBAL_1
-            case HeaderField.MBK_GLOBAL_1:
-                return HeaderField.MBK_GLOBAL_2
-            case HeaderField.MBK_GLOBAL_2:
-                return HeaderField.MBK_GLOBAL_3
-            case HeaderField.MBK_GLOBAL_3:
-                return HeaderField.MBK_GLOBAL_4
-            case HeaderField.MBK_GLOBAL_4:
-                return HeaderField.MBK_GLOBAL_5
-            case HeaderField.MBK_GLOBAL_5:
-                return HeaderField.MBK_ARM9_6
-            case HeaderField.MBK_ARM9_6:
-                return HeaderField.MBK_ARM9_7
-            case HeaderField.MBK_ARM9_7:
-                return HeaderField.MBK_ARM9_8
-            case HeaderField.MBK_ARM9_8:
-                return HeaderField.MBK_ARM7_6
-            case HeaderField.MBK_ARM7_6:
-                return HeaderField.MBK_ARM7_7
-            case HeaderField.MBK_ARM7_7:
-                return HeaderField.MBK_ARM7_8
-            case HeaderField.MBK_ARM7_8:
-                return HeaderField.MBK_WRAMCNT_SETTING
-            case HeaderField.MBK_WRAMCNT_SETTING:
-                return HeaderField.REGION_FLAGS
-            case HeaderField.REGION_FLAGS:
-                return HeaderField.ACCESS_CONTROL
-            case HeaderField.ACCESS_CONTROL:
-                return HeaderField.SCFG_EXT7_MASK
-            case HeaderField.SCFG_EXT7_MASK:
-                return HeaderField.UNK_1BC
-            case HeaderField.UNK_1BC:
-                return HeaderField.APPFLAGS
-            case HeaderField.APPFLAGS:
-                return HeaderField.ARM9I_ROMOFFSET
-            case HeaderField.ARM9I_ROMOFFSET:
-                return HeaderField.RESERVED_1C4
-            case HeaderField.RESERVED_1C4:
-                return HeaderField.ARM9I_LOADADDR
-            case HeaderField.ARM9I_LOADADDR:
-                return HeaderField.ARM9I_LOADSIZE
-            case HeaderField.ARM9I_LOADSIZE:
-                return HeaderField.ARM7I_ROMOFFSET
-            case HeaderField.ARM7I_ROMOFFSET:
-                return HeaderField.UNK_1D4
-            case HeaderField.UNK_1D4:
-                return HeaderField.ARM7I_LOADADDR
-            case HeaderField.ARM7I_LOADADDR:
-                return HeaderField.ARM7I_LOADSIZE
-            case HeaderField.ARM7I_LOADSIZE:
-                return HeaderField.DIGEST_NTR_START
-            case HeaderField.DIGEST_NTR_START:
-                return HeaderField.DIGEST_NTR_SIZE
-            case HeaderField.DIGEST_NTR_SIZE:
-                return HeaderField.DIGEST_TWL_START
-            case HeaderField.DIGEST_TWL_START:
-                return HeaderField.DIGEST_TWL_SIZE
-            case HeaderField.DIGEST_TWL_SIZE:
-                return HeaderField.SECTOR_HASHTABLE_START
-            case HeaderField.SECTOR_HASHTABLE_START:
-                return HeaderField.SECTOR_HASHTABLE_SIZE
-            case HeaderField.SECTOR_HASHTABLE_SIZE:
-                return HeaderField.BLOCK_HASHTABLE_START
-            case HeaderField.BLOCK_HASHTABLE_START:
-                return HeaderField.BLOCK_HASHTABLE_SIZE
-            case HeaderField.BLOCK_HASHTABLE_SIZE:
-                return HeaderField.DIGEST_SECTOR_SIZE
-            case HeaderField.DIGEST_SECTOR_SIZE:
-                return HeaderField.DIGEST_BLOCK_SECTORCOUNT
-            case HeaderField.DIGEST_BLOCK_SECTORCOUNT:
-                return HeaderField.BANNER_BSIZE
-            case HeaderField.BANNER_BSIZE:
-                return HeaderField.UNK_20C
-            case HeaderField.UNK_20C:
-                return HeaderField.TOTAL_ROMSIZE
-            case HeaderField.TOTAL_ROMSIZE:
-                return HeaderField.UNK_214
-            case HeaderField.UNK_214:
-                return HeaderField.UNK_218
-            case HeaderField.UNK_218:
-                return HeaderField.UNK_21C
-            case HeaderField.UNK_21C:
-                return HeaderField.MODCRYPT1_START
-            case HeaderField.MODCRYPT1_START:
-                return HeaderField.MODCRYPT1_SIZE
-            case HeaderField.MODCRYPT1_SIZE:
-                return HeaderField.MODCRYPT2_START
-            case HeaderField.MODCRYPT2_START:
-                return HeaderField.MODCRYPT2_SIZE
-            case HeaderField.MODCRYPT2_SIZE:
-                return HeaderField.TITLEID
-            case HeaderField.TITLEID:
-                return HeaderField.PUBLIC_SAV_SIZE
-            case HeaderField.PUBLIC_SAV_SIZE:
-                return HeaderField.PRIVATE_SAV_SIZE
-            case HeaderField.PRIVATE_SAV_SIZE:
-                return HeaderField.RESERVED_240
-            case HeaderField.RESERVED_240:
-                return HeaderField.AGE_RATINGS
-            case HeaderField.AGE_RATINGS:
-                return HeaderField.HMAC_ARM9
-            case HeaderField.HMAC_ARM9:
-                return HeaderField.HMAC_ARM7
-            case HeaderField.HMAC_ARM7:
-                return HeaderField.HMAC_DIGEST_MASTER
-            case HeaderField.HMAC_DIGEST_MASTER:
-                return HeaderField.HMAC_ICON_TITLE
-            case HeaderField.HMAC_ICON_TITLE:
-                return HeaderField.HMAC_ARM9I
-            case HeaderField.HMAC_ARM9I:
-                return HeaderField.HMAC_ARM7I
-            case HeaderField.HMAC_ARM7I:
-                return HeaderField.RESERVED_378
-            case HeaderField.RESERVED_378:
-                return HeaderField.RESERVED_38C
-            case HeaderField.RESERVED_38C:
-                return HeaderField.HMAC_ARM9_WO_SECURE_AREA
-            case HeaderField.HMAC_ARM9_WO_SECURE_AREA:
-                return HeaderField.RESERVED_3B4
-            case HeaderField.RESERVED_3B4:
-                return HeaderField.RESERVED_E00
-            case HeaderField.RESERVED_E00:
-                return HeaderField.RSA_SIGNATURE
-            case HeaderField.RSA_SIGNATURE:
-                return HeaderField.RESERVED_1000
-            case HeaderField.RESERVED_1000:
-                return HeaderField.ENTIRE_HEADER
-            case HeaderField.ENTIRE_HEADER:
-                return HeaderField.ENTIRE_HEADER
+        return HEADER_FIELD_SUCC_MAP[self]
 
     def len(self) -> int:
         """
         This is the length of this header field, computed by `self.succ() - self`.
         """
-        if self == HeaderField.ENTIRE_HEADER:
-            return self
-        else:
-            return self.succ() - self
+        return HEADER_FIELD_LEN_MAP[self]
+
+# the fields are declared in order of their offsets, so the successor of
+# each field is the next one declared.
+HEADER_FIELD_SUCC_MAP: Mapping[HeaderField, HeaderField] = dict(zip(HeaderField, [*HeaderField][1:] + [HeaderField.ENTIRE_HEADER]))
+"""
+The successor of each header field, i.e. the field following it. ENTIRE_HEADER maps to itself.
+"""
+
+HEADER_FIELD_LEN_MAP: Mapping[HeaderField, int] = {
+    field: succ - field if field != HeaderField.ENTIRE_HEADER else field
+    for field, succ in HEADER_FIELD_SUCC_MAP.items()
+}
+"""
+The length of each header field, in bytes. ENTIRE_HEADER maps to itself, the length of the whole header.
+"""
+
+HEADER_FIELD_SLICE_MAP: Mapping[HeaderField, slice] = {
+    field: slice(field, succ) if field != HeaderField.ENTIRE_HEADER else slice(0, field)
+    for field, succ in HEADER_FIELD_SUCC_MAP.items()
+}
+"""
+The slice of the header data occupied by each field. For ENTIRE_HEADER, this is the whole header.
+"""
+
+LE_STRUCT_MAP: Mapping[int, Struct] = {
+    1: Struct("<B"),
+    2: Struct("<H"),
+    4: Struct("<I"),
+    8: Struct("<Q"),
+}
+"""
+Little endian Structs for the field widths in bytes that they can pack. For other widths,
+`Header.get_le` and `Header.set_le` fall back to `int.from_bytes` and `int.to_bytes`.
+"""
 
 class Header:
     """
@@ -502,7 +323,7 @@ class Header:
     The underlying data of the header.
     """
 
-    def __init__(self, data: bytes):
+    def __init__(self, data: BytesLike):
         """
         Initialize a header with some underlying data. The length of the data must be 0x4000 bytes.
         """
@@ -514,81 +335,123 @@ class Header:
         """
         Get a field from the header as bytes.
         """
-        if key == HeaderField.ENTIRE_HEADER:
-            return bytes(self.data)
-        else:
-            return bytes(self.data[key:key.succ()])
+        return bytes(self.data[HEADER_FIELD_SLICE_MAP[key]])
     
+    def get_view(self, key: HeaderField) -> memoryview:
+        """
+        Get a field from the header as a view into the underlying data, without copying it.
+        """
+        return memoryview(self.data)[HEADER_FIELD_SLICE_MAP[key]]
+
     def __setitem__(self, key: HeaderField, value: bytes | int) -> None:
         """
         Set a field from the header from bytes or an integer. If an integer
         is passed, it is interpreted as little endian.
         """
         if isinstance(value, int):
-            value = value.to_bytes(key.len(), 'little')
-        if key == HeaderField.ENTIRE_HEADER:
-            self.data[:] = value
+            self.set_le(key, value)
+        else:
+            self.data[HEADER_FIELD_SLICE_MAP[key]] = value
+
+    def set_le(self, key: HeaderField, value: int) -> None:
+        """
+        Set a field from the header from an integer. It is written as little endian.
+        """
+        le_struct = LE_STRUCT_MAP.get(key.len())
+        # out of range values go through int.to_bytes, which raises an
+        # OverflowError without touching the header data.
+        if le_struct is not None and 0 <= value < 1 << (8 * key.len()):
+            le_struct.pack_into(self.data, key, value)
         else:
-            self.data[key:key.succ()] = value
+            self.data[HEADER_FIELD_SLICE_MAP[key]] = value.to_bytes(key.len(), 'little')
 
     def get_le(self, key: HeaderField) -> int:
         """
         Get a field from the header as an integer. It is interpreted as little endian.
         """
-        if key == HeaderField.ENTIRE_HEADER:
-            return int.from_bytes(self.data, 'little')
+        le_struct = LE_STRUCT_MAP.get(key.len())
+        if le_struct is None:
+            return int.from_bytes(self.get_view(key), 'little')
         else:
-            return int.from_bytes(self[key], 'little')
+            return le_struct.unpack_from(self.data, key)[0]
 
-    def get_rom_region(self, rom: bytes, offset: HeaderField, length: HeaderField) -> bytes:
+    def get_rom_region(self, rom: BytesLike, offset: HeaderField, length: HeaderField) -> BytesLike:
         """
         Given the entire ROM, the field corresponding to the offset in the ROM, and the
         field corresponding to the binary size in the ROM, return the region in the ROM.
+        If the ROM is a memoryview, the region is a view into it, and is not copied.
         """
         off = self.get_le(offset)
         return rom[off:off + self.get_le(length)]
 
-def get_files(header: Header, rom: bytes) -> Tuple[MutableSequence[bytes], Sequence[int]]:
+def get_files(header: Header, rom: BytesLike) -> Tuple[MutableSequence[bytes], Sequence[int]]:
     """
     Given a header and ROM, return the sequence of files in the FAT, as bytes,
     along with the order of these files within ROM.
     """
-    fatb = header.get_rom_region(rom, HeaderField.FATB_ROMOFFSET, HeaderField.FATB_BSIZE)
-    fatb_ints = [int.from_bytes(fatb[i:i + 4], 'little') for i in range(0, len(fatb), 4)]
-    files = [rom[fatb_ints[i]:fatb_ints[i + 1]] for i in range(0, len(fatb_ints), 2)]
-    order = sorted(range(len(fatb) // 8), key=lambda i : fatb_ints[2 * i])
+    rom_view = memoryview(rom)
+    fatb = header.get_rom_region(rom_view, HeaderField.FATB_ROMOFFSET, HeaderField.FATB_BSIZE)
+    num_file_entries = len(fatb) // 8
+    fatb_ints = unpack_from(f"<{num_file_entries * 2}I", fatb)
+    starts = fatb_ints[0::2]
+    files = [bytes(rom_view[start:end]) for start, end in zip(starts, fatb_ints[1::2])]
+    order = sorted(range(num_file_entries), key=starts.__getitem__)
     return (files, order)
 
-def get_filename_id_map(fntb: bytes) -> MutableMapping[str, int]:
+FAT_ENTRY_STRUCT = Struct("<2I")
+"""
+An entry of the FAT: the start and end offsets of a file.
+"""
+
+FNTB_DIR_STRUCT = Struct("<I2H")
+"""
+A directory's entry in the FNTB: the offset of its contents, its first file ID, and its parent's ID.
+For the root directory, the last field is the number of directories.
+"""
+FNTB_DIR_ID_STRUCT = Struct("<H")
+"""
+The directory ID following a subdirectory's name in the FNTB.
+"""
+
+def get_filename_id_map(fntb: BytesLike) -> MutableMapping[str, int]:
     """
     Given a header and ROM, return a mapping from file paths to file IDs (in the FAT).
     """
 
     ret = {}
-    dir_queue: SimpleQueue[Tuple[int, str]] = SimpleQueue()
+    dir_queue: deque[Tuple[int, str]] = deque()
     # queue is (dir id, dir path)
-    dir_queue.put((0, ''))
+    dir_queue.append((0, ''))
 
-    while not dir_queue.empty():
-        dir_id, dir_path = dir_queue.get()
-        contents_off, file_id = unpack_from("<IH", fntb, 8 * dir_id)
+    # slicing the names out of a view avoids copying them before decoding.
+    fntb_view = memoryview(fntb)
 
-        while fntb[contents_off] != 0:
-            is_dir = fntb[contents_off] & 0x80 != 0
-            name_len = fntb[contents_off] & 0x7F
+    while dir_queue:
+        dir_id, dir_path = dir_queue.popleft()
+        contents_off, file_id, _ = FNTB_DIR_STRUCT.unpack_from(fntb_view, 8 * dir_id)
+
+        entry = fntb_view[contents_off]
+        while entry != 0:
+            name_len = entry & 0x7F
             contents_off += 1
-            path = f"{dir_path}/{fntb[contents_off:contents_off + name_len].decode('ascii')}"
+            path = f"{dir_path}/{str(fntb_view[contents_off:contents_off + name_len], 'ascii')}"
             contents_off += name_len
-            if is_dir:
-                dir_id = 0xFFF & int.from_bytes(fntb[contents_off:contents_off + 2], 'little')
-                dir_queue.put((dir_id, path))
+            if entry & 0x80 != 0:
+                dir_id, = FNTB_DIR_ID_STRUCT.unpack_from(fntb_view, contents_off)
+                dir_queue.append((dir_id & 0xFFF, path))
                 contents_off += 2
             else:
                 ret[path] = file_id
                 file_id += 1
+            entry = fntb_view[contents_off]
 
     return ret
 
+OVERLAY_ENTRY_STRUCT = Struct("<8I")
+"""
+An entry of an overlay table.
+"""
+
 @dataclass
 class Overlay:
     """
@@ -622,7 +485,11 @@ class Overlay:
     The overlay's size when compressed, if it is compressed.
     """
 
-    def table_entry_data(self) -> MutableSequence[int]:
+    def table_entry_data(self, file_id: int = -1) -> MutableSequence[int]:
+        """
+        The values of this overlay's entry in the overlay table. The file ID is
+        not stored in the overlay, so it must be given to get a valid entry.
+        """
         return [
             self.id,
             self.ram_address,
@@ -630,40 +497,43 @@ class Overlay:
             self.bss_size,
             self.sinit_init,
             self.sinit_init_end,
-            -1,
+            file_id,
             (self.flags << 24) | self.compressed_size,
         ]
 
     def is_compressed(self) -> bool:
         return self.flags & 1 != 0
 
-def get_overlays(header: Header, rom: bytes, files: Sequence[bytes], which: Literal["9"] | Literal["7"]) -> MutableSequence[Overlay]:
+OVT_FIELDS_MAP: Mapping[Literal["9"] | Literal["7"], Tuple[HeaderField, HeaderField]] = {
+    "9": (HeaderField.OVT9_ROMOFFSET, HeaderField.OVT9_BSIZE),
+    "7": (HeaderField.OVT7_ROMOFFSET, HeaderField.OVT7_BSIZE),
+}
+"""
+The header fields containing the offset and size of the overlay table for each processor.
+"""
+
+def get_overlays(header: Header, rom: BytesLike, files: Sequence[bytes], which: Literal["9"] | Literal["7"]) -> MutableSequence[Overlay]:
     """
     Given a header, ROM, and the files in the ROM, return the overlays for either the ARM9 or ARM7 processor.
     """
-    table = header.get_rom_region(rom, getattr(HeaderField, f"OVT{which}_ROMOFFSET"), getattr(HeaderField, f"OVT{which}_BSIZE"))
-
-    ret = []
+    table = header.get_rom_region(memoryview(rom), *OVT_FIELDS_MAP[which])
 
-    for off in range(0, len(table), 32):
-        id, ram_address, ram_size, bss_size, sinit_init, sinit_init_end, file_id, flags_and_uc_size = unpack_from("<8I", table, off)
-        ret.append(Overlay(id, ram_address, ram_size, bss_size, sinit_init, sinit_init_end, files[file_id], flags_and_uc_size >> 24, flags_and_uc_size & 0xFFFFFF))
-
-    return ret
+    return [
+        Overlay(id, ram_address, ram_size, bss_size, sinit_init, sinit_init_end, files[file_id], flags_and_uc_size >> 24, flags_and_uc_size & 0xFFFFFF)
+        for id, ram_address, ram_size, bss_size, sinit_init, sinit_init_end, file_id, flags_and_uc_size in OVERLAY_ENTRY_STRUCT.iter_unpack(table)
+    ]
 
 def construct_overlay_table(overlays: Sequence[Overlay], file_id_off: int = 0) -> Tuple[bytes, Sequence[bytes]]:
     """
     Given a sequence of overlays, and a starting file ID, return the overlay table and the sequence of overlays.
     """
-    table = bytes()
+    table = bytearray(OVERLAY_ENTRY_STRUCT.size * len(overlays))
     data_seq = []
     for ov in overlays:
         file_id = len(data_seq) + file_id_off
+        OVERLAY_ENTRY_STRUCT.pack_into(table, OVERLAY_ENTRY_STRUCT.size * len(data_seq), *ov.table_entry_data(file_id))
         data_seq.append(ov.data)
-        table_entry_data = ov.table_entry_data()
-        table_entry_data[6] = file_id
-        table += pack("<8I", *table_entry_data)
-    return (table, data_seq)
+    return (bytes(table), data_seq)
 
 def path_key(path: str) -> Tuple:
     """
@@ -683,9 +553,6 @@ def construct_fntb(filenames: Iterable[str], file_id_off: int) -> Tuple[bytes, M
     Given the filenames in the ROM, and the first file ID for the files, construct the FNT
     and the mapping from filenames to file IDs.
     """
-    header = bytes()
-    contents = bytes()
-
     cur_dir = tuple()
     # path key -> dir id, seq of children (name, dir id or None)
     dir_map: MutableMapping[Tuple[str, ...], Tuple[int, MutableSequence[Tuple[str, int | None]]]] = {}
@@ -709,48 +576,57 @@ def construct_fntb(filenames: Iterable[str], file_id_off: int) -> Tuple[bytes, M
         cur_dir = parent_dir
         dir_map[parent_dir][1].append((pk[-1], None))
 
-    header_len = len(dir_map) * 8
+    header = bytearray(len(dir_map) * FNTB_DIR_STRUCT.size)
+    contents = bytearray()
     filename_id_map = {}
-    for pk, (_, children) in dir_map.items():
+    for dir_idx, (pk, (_, children)) in enumerate(dir_map.items()):
         parent_id = dir_map[pk[:-1]][0] if len(pk) > 0 else len(dir_map)
-        header += pack("<I2H", len(contents) + header_len, file_id_off, parent_id)
+        FNTB_DIR_STRUCT.pack_into(header, FNTB_DIR_STRUCT.size * dir_idx, len(contents) + len(header), file_id_off, parent_id)
         for name, id_if_dir in children:
-            contents += int.to_bytes(len(name) | (0x00 if id_if_dir is None else 0x80), 1)
-            contents += name.encode('ascii')
+            name_bytes = name.encode('ascii')
+            contents.append(len(name_bytes) | (0x00 if id_if_dir is None else 0x80))
+            contents += name_bytes
             if id_if_dir is not None:
-                contents += int.to_bytes(id_if_dir, 2, 'little')
+                contents += FNTB_DIR_ID_STRUCT.pack(id_if_dir)
             else:
                 filename_id_map[path_key_to_path(*pk, name)] = file_id_off
                 file_id_off += 1
-        contents += b'\0'
+        contents.append(0)
 
-    return (header + contents, filename_id_map)
+    return (b''.join((header, contents)), filename_id_map)
 
 CRC_TABLE: Sequence[int] = [0, 0xCC01, 0xD801, 0x1400, 0xF001, 0x3C00, 0x2800, 0xE401, 0xA001, 0x6C00, 0x7800, 0xB401, 0x5000, 0x9C01, 0x8801, 0x4400]
 
-def crc16(data: bytes, crc: int) -> int:
+def crc_byte_table_entry(b: int) -> int:
+    for _ in range(2):
+        b = (b >> 4) ^ CRC_TABLE[b & 0xF]
+    return b
+
+CRC_BYTE_TABLE: Sequence[int] = [crc_byte_table_entry(b) for b in range(256)]
+"""
+This is CRC_TABLE applied to both nibbles of a byte, so the CRC can be computed a byte at a time.
+"""
+
+def crc16(data: BytesLike, crc: int) -> int:
     """
     Compute the 16-bit CRC value for some bytes.
     """
-    bit = 0
+    # the data is processed in 16-bit words, so an odd trailing byte is zero-extended.
+    if len(data) & 1 != 0:
+        data = bytes(data) + b'\0'
 
-    for i in range(0, len(data), 2):
-        x = int.from_bytes(data[i:i + 2], 'little')
-        for bit in range(0, 16, 4):
-            y = CRC_TABLE[crc & 0xF]
-            crc >>= 4
-            crc ^= y
-            crc ^= CRC_TABLE[(x >> bit) & 0xF]
+    for b in data:
+        crc = (crc >> 8) ^ CRC_BYTE_TABLE[(crc ^ b) & 0xFF]
 
     return crc
 
-def process_modcrypt(rom: bytes, header: Header) -> bytes:
+def process_modcrypt(rom: BytesLike, header: Header) -> BytesLike:
     dsi_flags = header.get_le(HeaderField.DSI_FLAGS)
     if dsi_flags & 2 == 0:
         return rom
 
     if dsi_flags & 4 != 0 or header.get_le(HeaderField.APPFLAGS) & 0x80 != 0:
-        key = rom[:0x10][::-1]
+        key = bytes(rom[:0x10])[::-1]
     else:
         game_code = header[HeaderField.SERIAL]
         key_x = b'Nintendo' + game_code + game_code[::-1]
@@ -767,18 +643,19 @@ def process_modcrypt(rom: bytes, header: Header) -> bytes:
     iv2 = header[HeaderField.HMAC_ARM7][:0x10][::-1]
 
     rom_m = bytearray(rom)
+    rom_view = memoryview(rom)
 
     mc1_start = header.get_le(HeaderField.MODCRYPT1_START)
     if mc1_start != 0:
         mc1_size = header.get_le(HeaderField.MODCRYPT1_SIZE)
-        mc1 = rom[mc1_start:mc1_start + mc1_size]
+        mc1 = rom_view[mc1_start:mc1_start + mc1_size]
         new_mc1 = aes_ctr(key, iv1, mc1, True)
         rom_m[mc1_start:mc1_start + mc1_size] = new_mc1
 
     mc2_start = header.get_le(HeaderField.MODCRYPT2_START)
     if mc2_start != 0:
         mc2_size = header.get_le(HeaderField.MODCRYPT2_SIZE)
-        mc2 = rom[mc2_start:mc2_start + mc2_size]
+        mc2 = rom_view[mc2_start:mc2_start + mc2_size]
         new_mc2 = aes_ctr(key, iv2, mc2)
         rom_m[mc2_start:mc2_start + mc2_size] = new_mc2
 
@@ -837,7 +714,7 @@ class Rom:
     """
 
     @staticmethod
-    def from_bytes(rom: bytes, decrypt_modcrypt: bool = True) -> "Rom":
+    def from_bytes(rom: BytesLike, decrypt_modcrypt: bool = True) -> "Rom":
         """
         Decompose a ROM into its components.
 
@@ -845,45 +722,52 @@ class Rom:
         This should really only be set to False if working with a cartridge
         that already has the areas decrypted, but whose modcrypt
         regions haven't been cleared in the header.
+
+        The ROM may be any bytes-like object. It is read through a view, and
+        its regions are only copied when they become part of the decomposed ROM.
         """
-        header = Header(rom[:HeaderField.ENTIRE_HEADER])
+        rom_view = memoryview(rom).cast('B')
+        header = Header(rom_view[:HeaderField.ENTIRE_HEADER])
 
         if decrypt_modcrypt:
-            rom = process_modcrypt(rom, header)
+            rom_view = memoryview(process_modcrypt(rom_view, header))
 
-        (file_seq, file_id_order) = get_files(header, rom)
-        fntb = header.get_rom_region(rom, HeaderField.FNTB_ROMOFFSET, HeaderField.FNTB_BSIZE)
+        (file_seq, file_id_order) = get_files(header, rom_view)
+        fntb = header.get_rom_region(rom_view, HeaderField.FNTB_ROMOFFSET, HeaderField.FNTB_BSIZE)
         filename_id_map = get_filename_id_map(fntb)
-        arm9_ovys = get_overlays(header, rom, file_seq, "9")
-        arm7_ovys = get_overlays(header, rom, file_seq, "7")
-        id_filename_map = {id:name for name, id in filename_id_map.items()}
-        file_order = [id_filename_map[id] for id in file_id_order if id in id_filename_map]
+        arm9_ovys = get_overlays(header, rom_view, file_seq, "9")
+        arm7_ovys = get_overlays(header, rom_view, file_seq, "7")
+        # file ids index the FAT, so they can be mapped back to names with a list.
+        id_filename_seq: MutableSequence[str | None] = [None] * len(file_seq)
+        for name, id in filename_id_map.items():
+            id_filename_seq[id] = name
+        file_order = [name for name in map(id_filename_seq.__getitem__, file_id_order) if name is not None]
 
         arm9_start = header.get_le(HeaderField.ARM9_ROMOFFSET)
         if arm9_start < 0x8000:
             # we have a secure area
-            if rom[0x4000:0x4008] == b'encryObj':
+            if rom_view[0x4000:0x4008] == b'encryObj':
                 print("warning: this rom has an indication that it has an encrypted secure area. decryption is not currently implemented by this library")
-            elif rom[0x4000:0x4008] != b'\xFF\xDE\xFF\xE7' * 2:
+            elif rom_view[0x4000:0x4008] != b'\xFF\xDE\xFF\xE7' * 2:
                 print("warning: this rom has an indication that it had an encrypted secure area, but the secure area signature does not match that expected of a dump")
         arm9_len = header.get_le(HeaderField.ARM9_LOADSIZE)
-        if arm9_start + arm9_len + 12 <= len(rom) and rom[arm9_start + arm9_len:arm9_start + arm9_len + 4] == bytes.fromhex('2106C0DE'):
+        if arm9_start + arm9_len + 12 <= len(rom_view) and rom_view[arm9_start + arm9_len:arm9_start + arm9_len + 4] == ARM9_FOOTER_MAGIC:
             arm9_len += 12
-        arm9 = rom[arm9_start:arm9_start + arm9_len]
+        arm9 = bytes(rom_view[arm9_start:arm9_start + arm9_len])
 
-        arm7 = header.get_rom_region(rom, HeaderField.ARM7_ROMOFFSET, HeaderField.ARM7_LOADSIZE)
+        arm7 = bytes(header.get_rom_region(rom_view, HeaderField.ARM7_ROMOFFSET, HeaderField.ARM7_LOADSIZE))
 
         banner_off = header.get_le(HeaderField.BANNER_ROMOFFSET)
-        banner_version = int.from_bytes(rom[banner_off:banner_off + 2], 'little')
-        banner = rom[banner_off:banner_off + BANNER_SIZE_MAP[banner_version]]
+        banner_version, = LE_STRUCT_MAP[2].unpack_from(rom_view, banner_off)
+        banner = bytes(rom_view[banner_off:banner_off + BANNER_SIZE_MAP[banner_version]])
 
         if header.get_le(HeaderField.UNITCODE) != 0:
             if header.get_le(HeaderField.ARM9I_ROMOFFSET) != 0:
-                arm9i = header.get_rom_region(rom, HeaderField.ARM9I_ROMOFFSET, HeaderField.ARM9I_LOADSIZE)
+                arm9i = bytes(header.get_rom_region(rom_view, HeaderField.ARM9I_ROMOFFSET, HeaderField.ARM9I_LOADSIZE))
             else:
                 arm9i = None
             if header.get_le(HeaderField.ARM7I_ROMOFFSET) != 0:
-                arm7i = header.get_rom_region(rom, HeaderField.ARM7I_ROMOFFSET, HeaderField.ARM7I_LOADSIZE)
+                arm7i = bytes(header.get_rom_region(rom_view, HeaderField.ARM7I_ROMOFFSET, HeaderField.ARM7I_LOADSIZE))
             else:
                 arm7i = None
         else:
@@ -916,24 +800,26 @@ class Rom:
 
         fatb = bytearray(b'\0' * (len(ovys9) + len(ovys7) + len(self.files)) * 8)
         fatb_i = 0
-        post_header_bytes = bytes()
+        post_header_bytes = bytearray()
         header = Header(bytes(self.header.data))
 
         storage_type: Literal["MROM"] | Literal["PROM"] = "MROM" if header[HeaderField.SECURE_DELAY] == ST_MROM else "PROM"
 
         def cur_off() -> int:
             return len(post_header_bytes) + HeaderField.ENTIRE_HEADER
+        # padding never exceeds the alignment, so it can be sliced out of a single block.
+        fill_block = memoryview(fill_with * rom_alignment)
         def align_post_header_bytes() -> int:
             nonlocal post_header_bytes
             padding_len = -len(post_header_bytes) & (rom_alignment - 1)
-            post_header_bytes += fill_with * padding_len
+            post_header_bytes += fill_block[:padding_len]
             return padding_len
 
         header[HeaderField.ARM9_ROMOFFSET] = cur_off()
         post_header_bytes += self.arm9
         align_post_header_bytes()
 
-        if len(self.arm9) > 12 and self.arm9[-12:-8] == bytes.fromhex('2106C0DE'):
+        if len(self.arm9) > 12 and self.arm9[-12:-8] == ARM9_FOOTER_MAGIC:
             header[HeaderField.ARM9_LOADSIZE] = len(self.arm9) - 12
         else:
             header[HeaderField.ARM9_LOADSIZE] = len(self.arm9)
@@ -941,17 +827,14 @@ class Rom:
         def size_after_padding(size: int) -> int:
             return size + (-size & (rom_alignment - 1))
 
-        def pad_bytes(data: bytes) -> bytes:
-            padding = -len(data) & (rom_alignment - 1)
-            return data + fill_with * padding
-
         def write_ovs(which: Literal["9"] | Literal["7"]) -> None:
             nonlocal post_header_bytes
             nonlocal fatb_i
 
             ovt = ovt9 if which == "9" else ovt7
-            header[getattr(HeaderField, f"OVT{which}_ROMOFFSET")] = cur_off() if len(ovt) > 0 else 0
-            header[getattr(HeaderField, f"OVT{which}_BSIZE")] = len(ovt)
+            ovt_offset_field, ovt_size_field = OVT_FIELDS_MAP[which]
+            header[ovt_offset_field] = cur_off() if len(ovt) > 0 else 0
+            header[ovt_size_field] = len(ovt)
 
             post_header_bytes += ovt
             align_post_header_bytes()
@@ -959,10 +842,12 @@ class Rom:
             coff = cur_off()
             ovys = ovys9 if which == "9" else ovys7
             for ovy in ovys:
-                pack_into("<2I", fatb, fatb_i, coff, coff + len(ovy))
+                FAT_ENTRY_STRUCT.pack_into(fatb, fatb_i, coff, coff + len(ovy))
                 fatb_i += 8
                 coff += size_after_padding(len(ovy))
-            post_header_bytes += b''.join(pad_bytes(ovy) for ovy in ovys)
+            for ovy in ovys:
+                post_header_bytes += ovy
+                align_post_header_bytes()
 
         write_ovs("9")
 
@@ -987,7 +872,7 @@ class Rom:
 
             for path in file_order:
                 file = self.files[path]
-                pack_into("<2I", fatb, filename_id_map[path] * 8, file_off, file_off + len(file))
+                FAT_ENTRY_STRUCT.pack_into(fatb, filename_id_map[path] * 8, file_off, file_off + len(file))
                 file_off += size_after_padding(len(file))
         else:
             header[HeaderField.FNTB_ROMOFFSET] = 0
@@ -1003,13 +888,15 @@ class Rom:
         last_padding = align_post_header_bytes()
         header[HeaderField.BANNER_BSIZE] = len(self.banner)
 
-        post_header_bytes += b''.join(pad_bytes(self.files[path]) for path in file_order)
+        for path in file_order:
+            post_header_bytes += self.files[path]
+            align_post_header_bytes()
 
         if len(file_order) > 0:
             last_padding = -len(self.files[file_order[-1]]) & (rom_alignment - 1)
 
         if last_padding > 0:
-            post_header_bytes = post_header_bytes[:-last_padding]
+            del post_header_bytes[-last_padding:]
             last_padding = 0
 
         ntr_rom_size = cur_off()
@@ -1031,9 +918,8 @@ class Rom:
         # we clear the modcrypt areas (assuming that they were decrypted when loading... no need to re-encrypt,
         # and they might have moved... if people complain then I'll implement this again in the future.
         header[HeaderField.DSI_FLAGS] = header.get_le(HeaderField.DSI_FLAGS) & ~2
-        for i in [1, 2]:
-            for sfx in ["START", "SIZE"]:
-                header[getattr(HeaderField, f"MODCRYPT{i}_{sfx}")] = 0
+        for field in [HeaderField.MODCRYPT1_START, HeaderField.MODCRYPT1_SIZE, HeaderField.MODCRYPT2_START, HeaderField.MODCRYPT2_SIZE]:
+            header[field] = 0
 
         if has_twl_section:
             align_post_header_bytes()
@@ -1058,7 +944,7 @@ class Rom:
 
 
         if last_padding > 0:
-            post_header_bytes = post_header_bytes[:-last_padding]
+            del post_header_bytes[-last_padding:]
 
         total_rom_size = cur_off()
 
@@ -1081,12 +967,15 @@ class Rom:
             header[HeaderField.BANNER_BSIZE] = len(self.banner)
         header[HeaderField.HEADERSIZE] = HeaderField.ENTIRE_HEADER
 
-        header[HeaderField.HEADERCRC] = crc16(bytes(header.data[:HeaderField.HEADERCRC]), 0xFFFF)
+        header[HeaderField.HEADERCRC] = crc16(memoryview(header.data)[:HeaderField.HEADERCRC], 0xFFFF)
 
+        # the ROM is copied into its final buffer once, with the tail filled in the same pass.
         if fill_tail:
-            post_header_bytes += fill_with * (tailsize - len(post_header_bytes) - HeaderField.ENTIRE_HEADER)
+            tail = fill_with * (tailsize - total_rom_size)
+        else:
+            tail = b''
 
-        return bytes(header.data + post_header_bytes)
+        return b''.join((header.data, post_header_bytes, tail))
 
 __all__: list[str] = ['HeaderField', 'Header', 'Overlay', 'Rom']
 